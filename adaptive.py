@@ -0,0 +1,209 @@
+"""Adaptive short form of the assessment.
+
+Questions are chosen a page at a time by how much they could move the schemas
+whose place in the reported result is still open. By default the assessment
+stops only once no answers to the remaining questions could change the
+reported top schemas or the trauma note. A probabilistic stop rule can be
+enabled instead by passing a confidence.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from scoring import TRAUMA_SCHEMA_ID, get_top_schemas
+
+MIN_QUESTIONS = 20
+SAMPLES = 256
+PRIOR_WEIGHT = 2.0  # answered items a schema needs before its own level outweighs the overall one
+TRAUMA_THRESHOLD = 60
+
+
+class AdaptiveStatus(NamedTuple):
+    done: bool
+    settled: bool  # no answers to the unasked questions can change the reported result
+    confidence: object  # share of sampled completions agreeing; None unless the confidence rule is on
+    answered: int
+    scores: dict
+    top_schemas: list
+    root_cause_note: object
+    top_scores: dict
+    next_questions: list
+
+
+# ============================ ADAPTIVE ENGINE ============================
+# Unasked questions are modelled from the answers given so far. Each schema
+# has a level in [0, 1] with a Beta posterior built from its answered items
+# (direction-adjusted) and shrunk toward the respondent's overall level. An
+# unasked item is Binomial(4, p) + 1, or Bernoulli(p) for ACE items, where p
+# is the mean level of the schemas it maps to. Reported scores use the
+# expected values.
+#
+# Stop rule: every schema's score lies between the ones it gets with each
+# unasked question at its worst and at its best value. The result is settled
+# when each reported top-3 schema's lowest score still beats the highest
+# score of every other schema, and the trauma score is either reported, can't
+# exceed TRAUMA_THRESHOLD, or already does. That bound holds for any way the
+# respondent could answer the rest.
+#
+# With a confidence, the assessment instead stops (after min_questions) once
+# that share of completions sampled from the posterior match the reported
+# result. The posterior is not calibrated: its nominal confidence overstates
+# how often the short form agrees with the full assessment.
+#
+# The engine is stateless: everything is derived from the answers, so a
+# resumed session continues exactly where it left off.
+class AdaptiveEngine:
+    def __init__(self, matrix, confidence=None, min_questions=MIN_QUESTIONS,
+                 max_questions=None, samples=SAMPLES, seed=0):
+        self.matrix = matrix
+        self.confidence = confidence
+        self.samples = samples
+        self.seed = seed
+
+        weights = matrix.weights
+        self._sign = np.sign(weights)
+        self._linked = self._sign != 0
+        self._links = self._linked.sum(axis=1)
+        # Questions that feed no schema never need to be asked
+        self._mapped = self._links > 0
+        self._span = matrix.value_max - matrix.value_min
+        # Raw contribution of each question to each schema at its lowest and highest value
+        at_min = weights * matrix.value_min[:, None]
+        at_max = weights * matrix.value_max[:, None]
+        self._low = np.minimum(at_min, at_max)
+        self._high = np.maximum(at_min, at_max)
+        max_scores = np.where(matrix.max_scores > 0, matrix.max_scores, 1)
+        # Percentage points one unit of a question's value moves each schema
+        self._reach = np.abs(weights) / max_scores * 100
+        self._schema_order = np.asarray(matrix.schema_ids)
+        self._trauma_col = matrix.schema_ids.index(TRAUMA_SCHEMA_ID) if TRAUMA_SCHEMA_ID in matrix.schema_ids else None
+
+        n_mapped = int(self._mapped.sum())
+        self.min_questions = min(min_questions, n_mapped) if confidence is not None else 0
+        self.max_questions = min(max_questions or n_mapped, n_mapped)
+
+    def _state(self, answers):
+        values = np.zeros(len(self.matrix.question_ids))
+        answered = np.zeros(len(self.matrix.question_ids), dtype=bool)
+        for qid, value in answers.items():
+            col = self.matrix.question_index.get(int(qid))
+            if col is not None:
+                values[col] = self.matrix.transform_answer(qid, value)
+                answered[col] = True
+        return values, answered
+
+    def _schema_evidence(self, values, answered):
+        """Beta posterior (successes, failures) of each schema's level, plus the overall level.
+
+        Each answered item counts as span trials (4 for a 1-5 item, 1 for ACE)
+        scored in the schema's direction; PRIOR_WEIGHT items' worth of the
+        respondent's overall level is added as the prior, on top of Jeffreys' 0.5/0.5.
+        """
+        norm = (values - self.matrix.value_min) / self._span
+        adjusted = np.where(self._sign > 0, norm[:, None], 1 - norm[:, None])
+        seen = self._linked & answered[:, None]
+        trials = (seen * self._span[:, None]).sum(axis=0)
+        successes = (adjusted * seen * self._span[:, None]).sum(axis=0)
+        overall = successes.sum() / trials.sum() if trials.sum() else 0.5
+        prior_trials = PRIOR_WEIGHT * self._span[self._mapped].mean()
+        alpha = successes + prior_trials * overall + 0.5
+        beta = trials - successes + prior_trials * (1 - overall) + 0.5
+        return alpha, beta, overall
+
+    def _item_levels(self, schema_level, overall):
+        """P(high) per question from schema levels (S, or N x S for sampled levels)."""
+        schema_level = np.asarray(schema_level)[..., None, :]
+        item_level = np.where(self._sign > 0, schema_level, 1 - schema_level)
+        linked_mean = (item_level * self._linked).sum(axis=-1) / np.maximum(self._links, 1)
+        return np.where(self._mapped, linked_mean, overall)
+
+    def _outcomes(self, scores):
+        """Top-3 membership and trauma-note flags for N x S score rows."""
+        order = np.lexsort((np.broadcast_to(self._schema_order, scores.shape), -scores), axis=-1)
+        member = np.zeros(scores.shape, dtype=bool)
+        np.put_along_axis(member, order[:, :3], True, axis=-1)
+        if self._trauma_col is None:
+            trauma = np.zeros(len(scores), dtype=bool)
+        else:
+            trauma = (scores[:, self._trauma_col] > TRAUMA_THRESHOLD) & ~member[:, self._trauma_col]
+        return member, trauma
+
+    def _bounds(self, values, answered):
+        """Lowest and highest percentage each schema can still reach."""
+        base = self.matrix.offsets + (values * answered) @ self.matrix.weights
+        open_items = ~answered
+        low = np.rint(base + self._low[open_items].sum(axis=0)).astype(np.int64)
+        high = np.rint(base + self._high[open_items].sum(axis=0)).astype(np.int64)
+        return self.matrix.percentages(low), self.matrix.percentages(high)
+
+    def _contested(self, reported, low, high):
+        """Schemas whose reported place can still change, or None once the result is settled."""
+        # Schema a always ranks above b when a's lowest score beats b's highest
+        # (ties go to the lower schema id, as in get_top_schemas)
+        ids = self._schema_order
+        beats = (low[:, None] > high[None, :]) | ((low[:, None] == high[None, :]) & (ids[:, None] < ids[None, :]))
+        open_pairs = ~beats[np.ix_(reported, ~reported)]
+        contested = np.zeros(len(ids), dtype=bool)
+        contested[reported] = open_pairs.any(axis=1)
+        contested[~reported] = open_pairs.any(axis=0)
+        if self._trauma_col is not None:
+            t = self._trauma_col
+            reported_for_sure = reported[t] and not contested[t]
+            if not reported_for_sure and low[t] <= TRAUMA_THRESHOLD < high[t]:
+                contested[t] = True
+        return contested if contested.any() else None
+
+    def assess(self, answers, page_size=5):
+        values, answered = self._state(answers)
+        n_answered = int((answered & self._mapped).sum())
+        alpha, beta, overall = self._schema_evidence(values, answered)
+        level = self._item_levels(alpha / (alpha + beta), overall)
+
+        expected = np.where(answered, values, self.matrix.value_min + self._span * level)
+        scores = self.matrix.expected_scores(expected)
+        top_schemas, root_note, top_scores = get_top_schemas(scores)
+        reported = np.isin(self._schema_order, top_schemas[:3])
+
+        low, high = self._bounds(values, answered)
+        contested = self._contested(reported, low, high)
+        settled = contested is None
+        open_items = self._mapped & ~answered
+
+        confidence = None
+        if self.confidence is not None and not settled:
+            # Sampled completions, as 1-5 answers for score_batch (ACE 0/1 -> 1/2)
+            rng = np.random.default_rng((self.seed, n_answered))
+            sampled_levels = self._item_levels(rng.beta(alpha, beta, (self.samples, len(alpha))), overall)
+            sampled = self.matrix.value_min + rng.binomial(self._span, sampled_levels)
+            sampled = np.where(answered, values, sampled).astype(np.int64)
+            sample_scores = self.matrix.score_batch(np.where(self.matrix.ace_mask, sampled + 1, sampled))
+            member, trauma = self._outcomes(sample_scores)
+            agree = (member == reported).all(axis=1) & (trauma == (root_note is not None))
+            confidence = float(agree.mean())
+
+        done = settled or not open_items.any() or n_answered >= self.max_questions or (
+            confidence is not None and n_answered >= self.min_questions and confidence >= self.confidence)
+        if done:
+            return AdaptiveStatus(True, settled, confidence, n_answered, scores, top_schemas, root_note,
+                                  top_scores, [])
+
+        if confidence is None:
+            # Each question's pull on the contested schemas, in percentage
+            # points between its lowest and highest answer
+            gain = (self._reach[:, contested] * self._span[:, None]).sum(axis=1)
+        else:
+            # Uncertainty per schema about being reported; a small floor keeps the
+            # map weights deciding once nothing is contested (before min_questions)
+            p_member = member.mean(axis=0)
+            uncertainty = p_member * (1 - p_member) + 1e-3
+            if self._trauma_col is not None:
+                p_trauma = trauma.mean()
+                uncertainty[self._trauma_col] += p_trauma * (1 - p_trauma)
+            spread = np.sqrt(self._span * level * (1 - level))
+            gain = (self._reach * uncertainty).sum(axis=1) * spread
+        gain = np.where(open_items, gain, -1.0)
+        n_next = min(page_size, int(open_items.sum()), self.max_questions - n_answered)
+        chosen = np.argsort(-gain, kind='stable')[:n_next]
+        next_questions = [int(self.matrix.question_ids[col]) for col in sorted(chosen)]
+        return AdaptiveStatus(False, settled, confidence, n_answered, scores, top_schemas, root_note,
+                              top_scores, next_questions)
@@ -0,0 +1,160 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import zlib
+from collections.abc import MutableMapping
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+BITS_PER_ANSWER = 3
+MIN_ANSWER, MAX_ANSWER = 1, 5
+TOKEN_FORMAT = 2
+NONCE_BYTES = 12
+
+# Tokens only survive restarts (and work across replicas) when the secret is
+# configured; otherwise a random per-process secret is used.
+RESUME_TOKEN_SECRET = os.environ.get("RESUME_TOKEN_SECRET", "").encode() or secrets.token_bytes(32)
+
+
+@lru_cache(maxsize=None)
+def _layout(question_ids):
+    return question_ids, {qid: i for i, qid in enumerate(question_ids)}
+
+
+def packed_size(n_questions):
+    return (n_questions * BITS_PER_ANSWER + 7) // 8
+
+
+# ============================ PACKED ANSWERS ============================
+# A dict-compatible {question_id: answer} mapping that stores each answer in
+# 3 bits (0 = unanswered), so 100 answers take 38 bytes. The question layout
+# is shared between all instances with the same question ids.
+class PackedAnswers(MutableMapping):
+    __slots__ = ('question_ids', '_positions', '_data', '_count')
+
+    def __init__(self, question_ids, data=None):
+        self.question_ids, self._positions = _layout(tuple(int(qid) for qid in question_ids))
+        size = packed_size(len(self.question_ids))
+        if data is None:
+            self._data = bytearray(size)
+        elif len(data) == size:
+            self._data = bytearray(data)
+        else:
+            raise ValueError(f"expected {size} bytes of packed answers, got {len(data)}")
+        self._count = sum(1 for i in range(len(self.question_ids)) if self._get(i))
+
+    def _index(self, qid):
+        try:
+            return self._positions[int(qid)]
+        except (KeyError, TypeError, ValueError):
+            raise KeyError(qid) from None
+
+    def _get(self, i):
+        bit = i * BITS_PER_ANSWER
+        byte, shift = bit >> 3, bit & 7
+        word = int.from_bytes(self._data[byte:byte + 2], 'little')
+        return (word >> shift) & 0b111
+
+    def _set(self, i, value):
+        bit = i * BITS_PER_ANSWER
+        byte, shift = bit >> 3, bit & 7
+        width = 2 if byte + 1 < len(self._data) else 1
+        word = int.from_bytes(self._data[byte:byte + width], 'little')
+        word = (word & ~(0b111 << shift)) | (value << shift)
+        self._data[byte:byte + width] = word.to_bytes(width, 'little')
+
+    def __getitem__(self, qid):
+        value = self._get(self._index(qid))
+        if not value:
+            raise KeyError(qid)
+        return value
+
+    def __setitem__(self, qid, value):
+        value = int(value)
+        if not MIN_ANSWER <= value <= MAX_ANSWER:
+            raise ValueError(f"answer for question {qid} must be {MIN_ANSWER}-{MAX_ANSWER}, got {value}")
+        i = self._index(qid)
+        if not self._get(i):
+            self._count += 1
+        self._set(i, value)
+
+    def __delitem__(self, qid):
+        i = self._index(qid)
+        if not self._get(i):
+            raise KeyError(qid)
+        self._set(i, 0)
+        self._count -= 1
+
+    def __iter__(self):
+        return (qid for i, qid in enumerate(self.question_ids) if self._get(i))
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"PackedAnswers({dict(self)!r})"
+
+    def to_bytes(self):
+        return bytes(self._data)
+
+    @classmethod
+    def from_bytes(cls, question_ids, data):
+        return cls(question_ids, data)
+
+
+# ============================ RESUME TOKENS ============================
+# token = base64url(format | nonce | AES-GCM(page | packed answers))
+# The answers (including ACE and trauma items) end up in browser history and
+# logs with the URL, so they are encrypted, not just signed. The format byte
+# and the question layout are authenticated as associated data.
+def layout_fingerprint(question_ids):
+    return zlib.crc32(b','.join(str(int(qid)).encode() for qid in question_ids)).to_bytes(4, 'big')
+
+
+@lru_cache(maxsize=8)
+def _cipher(secret):
+    # A 256-bit key derived from the secret, whatever its length
+    return AESGCM(hmac.new(secret, b'resume-token', hashlib.sha256).digest())
+
+
+def _associated_data(question_ids):
+    return bytes([TOKEN_FORMAT]) + layout_fingerprint(question_ids)
+
+
+def encode_resume_token(answers, page, secret=None):
+    nonce = secrets.token_bytes(NONCE_BYTES)
+    plaintext = bytes([page]) + answers.to_bytes()
+    ciphertext = _cipher(secret or RESUME_TOKEN_SECRET).encrypt(
+        nonce, plaintext, _associated_data(answers.question_ids))
+    token = bytes([TOKEN_FORMAT]) + nonce + ciphertext
+    return base64.urlsafe_b64encode(token).rstrip(b'=').decode('ascii')
+
+
+def decode_resume_token(token, question_ids, secret=None):
+    """Return (page, PackedAnswers) for a valid token, or None."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if raw[:1] != bytes([TOKEN_FORMAT]):
+        return None
+    nonce, ciphertext = raw[1:1 + NONCE_BYTES], raw[1 + NONCE_BYTES:]
+    try:
+        plaintext = _cipher(secret or RESUME_TOKEN_SECRET).decrypt(
+            nonce, ciphertext, _associated_data(question_ids))
+    except (InvalidTag, ValueError):
+        return None
+    if len(plaintext) != 1 + packed_size(len(question_ids)):
+        return None
+    try:
+        answers = PackedAnswers(question_ids, plaintext[1:])
+    except ValueError:
+        return None
+    if any(value > MAX_ANSWER for value in answers.values()):
+        return None
+    return plaintext[0], answers
@@ -0,0 +1,190 @@
+"""Score exported responses outside the Streamlit app.
+
+    python batch_score.py responses.csv -o scores.csv
+    python batch_score.py responses.jsonl -o scores.jsonl --workers 8
+
+CSV input has one row per respondent with question columns named by ID
+("1", "Q1" or "q_1") and an optional respondent id column. JSONL input has
+one object per line, either flat like a CSV row or with the answers nested
+under "answers". Rows missing any answer get empty scores, exactly like the
+app's scoring (ScoreMatrix.score).
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+from collections import deque
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_bundle
+from scoring import get_top_schemas
+
+QUESTION_COLUMN = re.compile(r'^(?:[Qq]_?)?(\d+)$')
+
+_score_matrix = None
+_output_format = None
+
+
+def question_id(column):
+    match = QUESTION_COLUMN.match(str(column).strip())
+    return int(match.group(1)) if match else None
+
+
+# ============================ INPUT ============================
+def frame_to_chunk(frame, question_ids, id_column, first_row):
+    columns = {question_id(c): c for c in frame.columns if question_id(c) is not None}
+    present = [qid in columns for qid in question_ids]
+    values = np.full((len(frame), len(question_ids)), np.nan)
+    if any(present):
+        selected = frame[[columns[qid] for qid in question_ids if qid in columns]]
+        values[:, present] = selected.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    missing = np.isnan(values)
+    complete = ~missing.any(axis=1)
+    answers = np.clip(np.where(missing, 0, values), -128, 127).astype(np.int8)
+    if id_column in frame.columns:
+        ids = frame[id_column].astype(str).tolist()
+    else:
+        ids = [str(i) for i in range(first_row, first_row + len(frame))]
+    return ids, answers, complete
+
+
+def read_csv_chunks(path, question_ids, id_column, chunk_size):
+    first_row = 1
+    for frame in pd.read_csv(path, chunksize=chunk_size, dtype={id_column: str}):
+        yield frame_to_chunk(frame, question_ids, id_column, first_row)
+        first_row += len(frame)
+
+
+def read_jsonl_chunks(path, question_ids, id_column, chunk_size):
+    first_row, rows = 1, []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            row = dict(record.get('answers') or {})
+            row.update((k, v) for k, v in record.items() if k != 'answers')
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield frame_to_chunk(pd.DataFrame(rows), question_ids, id_column, first_row)
+                first_row += len(rows)
+                rows = []
+    if rows:
+        yield frame_to_chunk(pd.DataFrame(rows), question_ids, id_column, first_row)
+
+
+# ============================ SCORING ============================
+def init_worker(data_dir, output_format):
+    global _score_matrix, _output_format
+    _score_matrix = load_bundle(data_dir).score_matrix
+    _output_format = output_format
+
+
+def score_chunk(chunk):
+    ids, answers, complete = chunk
+    percentages = _score_matrix.score_batch(answers)
+    out = io.StringIO()
+    write = write_jsonl_row if _output_format == 'jsonl' else csv.writer(out).writerow
+    schema_ids = _score_matrix.schema_ids
+    for respondent_id, row, is_complete in zip(ids, percentages, complete):
+        scores = _score_matrix.scores_to_dict(row) if is_complete else {}
+        top_schemas, root_note, _ = get_top_schemas(scores)
+        if _output_format == 'jsonl':
+            write(out, respondent_id, scores, top_schemas, root_note)
+        else:
+            write([respondent_id] + [scores.get(sid, '') for sid in schema_ids]
+                  + [';'.join(map(str, top_schemas)), root_note or ''])
+    return len(ids), out.getvalue()
+
+
+# ============================ OUTPUT ============================
+def csv_header(schema_ids):
+    return ['respondent_id'] + [f'schema_{sid}' for sid in schema_ids] + ['top_schemas', 'root_cause_note']
+
+
+def write_jsonl_row(stream, respondent_id, scores, top_schemas, root_note):
+    stream.write(json.dumps({
+        'respondent_id': respondent_id,
+        'scores': {str(sid): pct for sid, pct in scores.items()},
+        'top_schemas': top_schemas,
+        'root_cause_note': root_note,
+    }) + '\n')
+
+
+def detect_format(path, explicit):
+    if explicit:
+        return explicit
+    return 'jsonl' if str(path).lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def iter_results(chunks, workers, data_dir, output_format):
+    if workers <= 1:
+        init_worker(data_dir, output_format)
+        for chunk in chunks:
+            yield score_chunk(chunk)
+        return
+    # Bounded submission keeps only a few chunks in flight, so memory stays
+    # flat however large the input is, and output stays in input order.
+    max_in_flight = workers * 2
+    pending = deque()
+    with Pool(workers, initializer=init_worker, initargs=(data_dir, output_format)) as pool:
+        for chunk in chunks:
+            pending.append(pool.apply_async(score_chunk, (chunk,)))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def run(input_path, output, input_format=None, output_format=None, chunk_size=10000,
+        workers=None, id_column='respondent_id', data_dir=None):
+    bundle = load_bundle(data_dir)
+    question_ids = [int(qid) for qid in bundle.score_matrix.question_ids]
+    read_chunks = read_jsonl_chunks if detect_format(input_path, input_format) == 'jsonl' else read_csv_chunks
+    output_format = output_format or 'csv'
+    if output_format == 'csv':
+        csv.writer(output).writerow(csv_header(bundle.score_matrix.schema_ids))
+
+    count = 0
+    chunks = read_chunks(input_path, question_ids, id_column, chunk_size)
+    for scored, text in iter_results(chunks, workers or os.cpu_count() or 1, data_dir, output_format):
+        output.write(text)
+        output.flush()
+        count += scored
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score exported assessment responses.")
+    parser.add_argument('input', help="CSV or JSONL file of responses")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="respondents per chunk")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="scoring processes")
+    parser.add_argument('--id-column', default='respondent_id')
+    parser.add_argument('--data-dir', help="directory holding the assessment CSVs")
+    args = parser.parse_args(argv)
+
+    output_format = args.output_format or (detect_format(args.output, None) if args.output != '-' else 'csv')
+    try:
+        if args.output == '-':
+            count = run(args.input, sys.stdout, args.input_format, output_format, args.chunk_size,
+                        args.workers, args.id_column, args.data_dir)
+        else:
+            with open(args.output, 'w', newline='', encoding='utf-8') as output:
+                count = run(args.input, output, args.input_format, output_format, args.chunk_size,
+                            args.workers, args.id_column, args.data_dir)
+    except ValueError as e:
+        parser.exit(1, f"error: {e}\n")
+    print(f"Scored {count} respondents", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
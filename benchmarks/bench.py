@@ -0,0 +1,288 @@
+"""Micro-benchmarks for the load, score, rank, render and PDF paths.
+
+    python benchmarks/bench.py                      # run and compare to baseline.json
+    python benchmarks/bench.py --update-baseline    # record a new baseline
+    python benchmarks/bench.py --skip-apptest       # library timings only
+
+Results are written as JSON. Each timing round is paired with a round of a
+fixed calibration workload, and metrics are compared as the median ratio of
+the two. That cancels most of the drift in machine speed between runs (CPU
+frequency, noisy neighbours), which raw times on shared machines swing with by
+50% or more. Any metric whose ratio is more than the threshold (default 25%,
+overridable per metric in the baseline file) above its baseline is reported
+as a regression and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from action_plans import ACTION_PLANS
+from data_loader import MAP_FILE, load_bundle, load_csv_smart
+from report import ReportEngine, format_action_plan_html, generate_pdf
+from scoring import IncrementalScores, get_top_schemas
+
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+RESULTS_PATH = os.path.join(ROOT, 'benchmarks', 'results.json')
+DEFAULT_THRESHOLD = 0.25
+SEED = 1234
+ROUNDS = 61
+ROUND_TIME = 0.02
+
+_calibration_matrix = np.arange(4096, dtype=np.float64).reshape(64, 64)
+
+
+def calibration_work():
+    # Dict building, sorting and a small matmul: the same mix of interpreter
+    # and numpy work as the measured paths
+    table = {i: i * 2 for i in range(2000)}
+    ranked = sorted(table.items(), key=lambda x: -x[1])
+    return (_calibration_matrix @ _calibration_matrix).sum(), ranked[0]
+
+
+def calls_per_round(timer, round_time=ROUND_TIME):
+    number, elapsed = timer.autorange()
+    return max(1, int(number * round_time / max(elapsed, 1e-9)))
+
+
+_calibration = timeit.Timer(calibration_work)
+_calibration_calls = None
+
+
+def calibration_round():
+    global _calibration_calls
+    if _calibration_calls is None:
+        _calibration_calls = calls_per_round(_calibration)
+    return _calibration.timeit(_calibration_calls) / _calibration_calls
+
+
+def summarize_rounds(per_call, relative, calls):
+    return {'median': statistics.median(per_call), 'min': min(per_call), 'calls': calls,
+            'relative': statistics.median(relative)}
+
+
+def measure(func, rounds=ROUNDS):
+    """Per-call seconds over ``rounds`` rounds, each paired with a calibration round."""
+    timer = timeit.Timer(func)
+    number = calls_per_round(timer)
+    per_call, relative = [], []
+    for _ in range(rounds):
+        calibration = calibration_round()
+        per_call.append(timer.timeit(number) / number)
+        relative.append(per_call[-1] / calibration)
+    return summarize_rounds(per_call, relative, number * rounds)
+
+
+class RoundTimer:
+    """Times single calls made elsewhere (e.g. AppTest reruns), each after a calibration round."""
+
+    def __init__(self):
+        self.per_call, self.relative = [], []
+
+    def __call__(self, func):
+        calibration = calibration_round()
+        start = time.perf_counter()
+        result = func()
+        self.per_call.append(time.perf_counter() - start)
+        self.relative.append(self.per_call[-1] / calibration)
+        return result
+
+    def __len__(self):
+        return len(self.per_call)
+
+    def summary(self):
+        return summarize_rounds(self.per_call, self.relative, len(self.per_call))
+
+
+def random_answer_sets(question_ids, n, rng):
+    return [{int(qid): int(v) for qid, v in zip(question_ids, row)}
+            for row in rng.integers(1, 6, (n, len(question_ids)))]
+
+
+# ============================ LIBRARY BENCHMARKS ============================
+def bench_library(n_answer_sets=200):
+    rng = np.random.default_rng(SEED)
+    bundle = load_bundle()
+    matrix = bundle.score_matrix
+    answer_sets = random_answer_sets(matrix.question_ids, n_answer_sets, rng)
+    score_sets = [matrix.score(a) for a in answer_sets]
+    tops = [get_top_schemas(s) for s in score_sets]
+    engine = ReportEngine(bundle.schemas_df, ACTION_PLANS)
+    report_args = [(top, top_scores) for top, _, top_scores in tops]
+    texts = [engine.plain_text(*args) for args in report_args]
+    batch = rng.integers(1, 6, (10000, len(matrix.question_ids)))
+
+    def cycle(items):
+        state = {'i': 0}
+
+        def next_item():
+            state['i'] = (state['i'] + 1) % len(items)
+            return items[state['i']]
+        return next_item
+
+    next_answers, next_scores = cycle(answer_sets), cycle(score_sets)
+    next_text, next_report_args = cycle(texts), cycle(report_args)
+    next_plan = cycle(list(ACTION_PLANS.values()))
+
+    def incremental_full_assessment():
+        scorer = IncrementalScores(matrix)
+        for qid, value in next_answers().items():
+            scorer.update(qid, value)
+        return scorer.scores()
+
+    return {
+        'load_csv_smart': measure(lambda: load_csv_smart(os.path.join(ROOT, MAP_FILE))),
+        'calculate_schema_scores': measure(lambda: matrix.score(next_answers())),
+        'incremental_full_assessment': measure(incremental_full_assessment),
+        'score_batch_10k': measure(lambda: matrix.score_batch(batch)),
+        'get_top_schemas': measure(lambda: get_top_schemas(next_scores())),
+        'format_action_plan_html': measure(lambda: format_action_plan_html(next_plan())),
+        'generate_pdf': measure(lambda: generate_pdf(next_text())),
+        'report_engine_cached': measure(lambda: engine.render(*next_report_args())),
+    }
+
+
+# ============================ RERUN BENCHMARKS ============================
+def share_script_cache():
+    # AppTest compiles the script afresh on every run, while the server keeps
+    # one ScriptCache per process. Without sharing it, rerun timings mostly
+    # track the size of app.py rather than the work a served rerun does.
+    # These are Streamlit internals: refuse to run rather than silently
+    # measure something else if they move.
+    from streamlit.runtime.scriptrunner import script_cache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    patched = (app_test, local_script_runner)
+    missing = [module.__name__ for module in patched
+               if getattr(module, 'ScriptCache', None) is not script_cache.ScriptCache]
+    if missing:
+        raise RuntimeError(f"cannot share the script cache: ScriptCache not found in {', '.join(missing)}; "
+                           "update share_script_cache() for this Streamlit version")
+    shared = script_cache.ScriptCache()
+    for module in patched:
+        module.ScriptCache = lambda: shared
+
+
+def bench_reruns(reruns=ROUNDS):
+    from streamlit.testing.v1 import AppTest
+
+    share_script_cache()
+
+    # Keep the benchmark from touching the response store or norms snapshot
+    os.environ['RESPONSE_STORE_PATH'] = ''
+    os.environ['NORMS_SNAPSHOT_PATH'] = ''
+    app_path = os.path.join(ROOT, 'app.py')
+
+    def timed_reruns(at):
+        timed = RoundTimer()
+        for _ in range(reruns):
+            timed(at.run)
+        if at.exception:
+            raise RuntimeError(f"app raised during benchmark: {at.exception}")
+        return timed.summary()
+
+    at = AppTest.from_file(app_path, default_timeout=60).run()
+    question_page = timed_reruns(at)
+
+    def timed_submits(at, timed):
+        while at.session_state.page < 10:
+            button = next(b for b in at.button if b.label in ("Next", "Submit & See Results"))
+            timed(button.click().run)
+
+    submits = RoundTimer()
+    timed_submits(at, submits)
+    results_page = timed_reruns(at)
+    # A session only has ten submits; take about as many samples as the other metrics
+    while len(submits) < reruns:
+        timed_submits(AppTest.from_file(app_path, default_timeout=60).run(), submits)
+
+    return {
+        'rerun_question_page': question_page,
+        'rerun_section_submit': submits.summary(),
+        'rerun_results_page': results_page,
+    }
+
+
+# ============================ BASELINE COMPARISON ============================
+def compare(results, baseline, default_threshold):
+    thresholds = baseline.get('thresholds', {})
+    regressions, lines = [], []
+    for name, current in sorted(results.items()):
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            lines.append(f"{name:32s} {current['min'] * 1e3:10.3f} ms   (no baseline)")
+            continue
+        # Calibration-relative times are compared; raw times drift with the machine
+        if 'relative' not in base:
+            lines.append(f"{name:32s} {current['min'] * 1e3:10.3f} ms   (baseline predates calibration)")
+            continue
+        ratio = current['relative'] / base['relative'] if base['relative'] else float('inf')
+        limit = 1 + thresholds.get(name, default_threshold)
+        flag = "REGRESSION" if ratio > limit else ""
+        lines.append(f"{name:32s} {current['min'] * 1e3:10.3f} ms (median {current['median'] * 1e3:.3f})"
+                     f"   {ratio:6.2f}x baseline  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions, lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument('-o', '--output', default=RESULTS_PATH, help="JSON results file")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument('--skip-apptest', action='store_true', help="skip Streamlit rerun benchmarks")
+    parser.add_argument('--reruns', type=int, default=ROUNDS, help="reruns timed per page")
+    args = parser.parse_args(argv)
+
+    results = bench_library()
+    if not args.skip_apptest:
+        results.update(bench_reruns(args.reruns))
+
+    report = {
+        'metadata': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+        report['thresholds'] = previous.get('thresholds', {})
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions, lines = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
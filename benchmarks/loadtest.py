@@ -0,0 +1,217 @@
+"""Concurrent-session load test for app.py.
+
+    python benchmarks/loadtest.py --sessions 40 --concurrency 20
+    python benchmarks/loadtest.py --sessions 40 --concurrency 20 --cpus 2 --think 2 8
+
+Each simulated test-taker runs the full flow through AppTest: first load,
+ten answered sections with think time between submits, and the results page.
+Up to --concurrency sessions run at once, one per worker process (AppTest
+cannot share a process between threads), started over --ramp seconds.
+--cpus pins all workers to that many cores to mimic an instance's vCPUs.
+
+Reported: p50/p95/p99 rerun latency (overall and per rerun kind), reruns and
+completed sessions per second, and resident memory per live session.
+AppTest runs the script directly, so latencies cover script execution and
+session state, not websocket transport or browser rendering.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+APP_PATH = os.path.join(ROOT, 'app.py')
+PERCENTILES = (50, 95, 99)
+
+
+def rss_bytes():
+    """Current resident set size; falls back to the peak where /proc is missing."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# ============================ WORKER ============================
+_baseline_rss = 0
+
+
+def restore_main(func):
+    # AppTest swaps sys.modules['__main__'] for the app script, which breaks
+    # unpickling of the pool's tasks (they are looked up on __main__)
+    main = sys.modules['__main__']
+    try:
+        return func()
+    finally:
+        sys.modules['__main__'] = main
+
+
+def init_worker(cpus, ready):
+    global _baseline_rss
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, set(range(cpus)))
+    # Keep simulated sessions out of the response store and norms snapshot
+    os.environ['RESPONSE_STORE_PATH'] = ''
+    os.environ['NORMS_SNAPSHOT_PATH'] = ''
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # One throwaway session so imports and the data bundle aren't billed to a user
+    restore_main(AppTest.from_file(APP_PATH, default_timeout=60).run)
+    # Streamlit configures its loggers on the first run, so quiet them after it
+    set_log_level('error')
+    _baseline_rss = rss_bytes()
+    ready.wait()
+
+
+def run_session(task):
+    from streamlit.testing.v1 import AppTest
+
+    index, start_at, think, seed = task
+    rng = random.Random(seed)
+    time.sleep(max(0.0, start_at - time.time()))
+
+    reruns = []
+
+    def timed(kind, func):
+        start = time.perf_counter()
+        at = restore_main(func)
+        reruns.append((kind, time.perf_counter() - start))
+        if at.exception:
+            raise RuntimeError(f"session {index} raised: {at.exception}")
+        return at
+
+    session_start = time.time()
+    at = timed('first_load', AppTest.from_file(APP_PATH, default_timeout=60).run)
+    while at.session_state.page < 10:
+        for radio in at.radio:
+            radio.set_value(rng.choice(radio.options))
+        time.sleep(rng.uniform(*think))
+        button = next(b for b in at.button if b.label in ("Next", "Submit & See Results"))
+        kind = 'results' if button.label != "Next" else 'section'
+        at = timed(kind, button.click().run)
+
+    # Measured while the finished session is still alive
+    session_rss = rss_bytes() - _baseline_rss
+    return {
+        'index': index,
+        'started': session_start,
+        'finished': time.time(),
+        'reruns': reruns,
+        'rss_delta': session_rss,
+        'worker_rss': rss_bytes(),
+        'pid': os.getpid(),
+    }
+
+
+# ============================ REPORT ============================
+def percentiles(samples):
+    values = np.percentile(samples, PERCENTILES) if samples else [float('nan')] * len(PERCENTILES)
+    return {f'p{p}': float(v) for p, v in zip(PERCENTILES, values)}
+
+
+def summarize(sessions, wall_time, args):
+    all_latencies = [t for s in sessions for _, t in s['reruns']]
+    by_kind = {}
+    for s in sessions:
+        for kind, t in s['reruns']:
+            by_kind.setdefault(kind, []).append(t)
+    worker_rss = {}
+    for s in sessions:
+        worker_rss[s['pid']] = max(worker_rss.get(s['pid'], 0), s['worker_rss'])
+    deltas = [s['rss_delta'] for s in sessions]
+    durations = [s['finished'] - s['started'] for s in sessions]
+
+    return {
+        'sessions': len(sessions),
+        'concurrency': args.concurrency,
+        'cpus': args.cpus or os.cpu_count(),
+        'think_seconds': list(args.think),
+        'wall_seconds': wall_time,
+        'rerun_latency': dict(percentiles(all_latencies), count=len(all_latencies)),
+        'rerun_latency_by_kind': {kind: dict(percentiles(v), count=len(v)) for kind, v in sorted(by_kind.items())},
+        'throughput': {
+            'reruns_per_second': len(all_latencies) / wall_time,
+            'sessions_per_minute': len(sessions) / wall_time * 60,
+        },
+        'session_seconds': percentiles(durations),
+        'rss_per_session_bytes': {
+            'median': float(np.median(deltas)),
+            'max': float(max(deltas)),
+        },
+        'worker_rss_bytes': {
+            'median': float(np.median(list(worker_rss.values()))),
+            'max': float(max(worker_rss.values())),
+        },
+    }
+
+
+def print_summary(summary):
+    def ms(stats):
+        return '  '.join(f"{k} {stats[k] * 1e3:8.1f} ms" for k in ('p50', 'p95', 'p99'))
+
+    print(f"{summary['sessions']} sessions, {summary['concurrency']} concurrent, "
+          f"{summary['cpus']} cpu(s), {summary['wall_seconds']:.1f}s wall")
+    print(f"{'rerun latency':24s} {ms(summary['rerun_latency'])}  (n={summary['rerun_latency']['count']})")
+    for kind, stats in summary['rerun_latency_by_kind'].items():
+        print(f"  {kind:22s} {ms(stats)}  (n={stats['count']})")
+    throughput = summary['throughput']
+    print(f"{'throughput':24s} {throughput['reruns_per_second']:.2f} reruns/s, "
+          f"{throughput['sessions_per_minute']:.1f} sessions/min")
+    rss, worker = summary['rss_per_session_bytes'], summary['worker_rss_bytes']
+    print(f"{'rss per session':24s} median {rss['median'] / 2**20:.1f} MiB, max {rss['max'] / 2**20:.1f} MiB")
+    print(f"{'worker rss':24s} median {worker['median'] / 2**20:.1f} MiB, max {worker['max'] / 2**20:.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated sessions through app.py.")
+    parser.add_argument('--sessions', type=int, default=16, help="total sessions to run")
+    parser.add_argument('--concurrency', type=int, default=8, help="sessions running at once")
+    parser.add_argument('--think', type=float, nargs=2, default=(1.0, 4.0), metavar=('MIN', 'MAX'),
+                        help="think time in seconds before each section submit")
+    parser.add_argument('--ramp', type=float, default=5.0, help="seconds over which sessions start")
+    parser.add_argument('--cpus', type=int, help="pin workers to this many cores")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('-o', '--output', help="write the summary as JSON")
+    args = parser.parse_args(argv)
+
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Barrier(args.concurrency + 1)
+    with ctx.Pool(args.concurrency, initializer=init_worker, initargs=(args.cpus, ready)) as pool:
+        # Start the clock once every worker has warmed up
+        ready.wait()
+        begin = time.time()
+        tasks = [(i, begin + args.ramp * i / max(args.sessions, 1), tuple(args.think), args.seed + i)
+                 for i in range(args.sessions)]
+        sessions = list(pool.imap_unordered(run_session, tasks))
+        wall_time = time.time() - begin
+
+    summary = summarize(sessions, wall_time, args)
+    print_summary(summary)
+    if args.output:
+        summary['metadata'] = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
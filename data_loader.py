@@ -0,0 +1,167 @@
+import codecs
+import hashlib
+import os
+import pickle
+import threading
+from io import BytesIO
+from typing import NamedTuple
+
+import pandas as pd
+
+from scoring import ScoreMatrix
+
+DATA_DIR = os.environ.get("ASSESSMENT_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+# Optional path of a pickled bundle; lets a fresh container skip CSV parsing
+SNAPSHOT_PATH = os.environ.get("ASSESSMENT_SNAPSHOT")
+
+QUESTIONS_FILE = "Updated_100Q_Assessment.csv"
+MAP_FILE = "Schema_Weighted_Score_Map.csv"
+SCHEMAS_FILE = "20_Core_Schemas.csv"
+
+REQUIRED_COLUMNS = {
+    QUESTIONS_FILE: ['ID', 'Question Text'],
+    MAP_FILE: ['Schema_ID', 'Question_ID', 'Direction'],
+    SCHEMAS_FILE: ['Schema', 'Schema Name', 'Root Causes (Childhood Drivers)', 'Symptoms & Behavioral Loops'],
+}
+
+ENCODINGS = ['utf-8', 'utf-16', 'cp1252', 'latin1', 'iso-8859-1', 'mbcs']
+SEPARATORS = [',', '\t', ';']
+
+
+# ============================ CSV LOADING ============================
+def detect_csv_format(data):
+    if data.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+        text = data.decode(encoding)
+    else:
+        for encoding in ENCODINGS:
+            try:
+                text = data.decode(encoding)
+                break
+            except (UnicodeDecodeError, LookupError):
+                pass
+        else:
+            raise ValueError("unrecognised text encoding")
+    header = text.split('\n', 1)[0]
+    sep = max(SEPARATORS, key=header.count)
+    return encoding, sep
+
+
+def parse_csv(data, filename):
+    try:
+        encoding, sep = detect_csv_format(data)
+        return pd.read_csv(BytesIO(data), encoding=encoding, sep=sep, on_bad_lines='skip')
+    except (ValueError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise ValueError(f"Could not load {filename}: {e}") from e
+
+
+def load_csv_smart(filename):
+    with open(filename, 'rb') as f:
+        return parse_csv(f.read(), filename)
+
+
+# ============================ ASSESSMENT BUNDLE ============================
+# One immutable bundle per data directory is shared by every session in the
+# process. Treat the DataFrames as read-only.
+class AssessmentBundle(NamedTuple):
+    questions_df: pd.DataFrame
+    map_df: pd.DataFrame
+    schemas_df: pd.DataFrame
+    score_matrix: ScoreMatrix
+    file_hashes: dict
+    version: str
+
+    @property
+    def map_version(self):
+        return self.file_hashes[MAP_FILE][:12]
+
+
+def validate_frames(questions_df, map_df, schemas_df):
+    frames = {QUESTIONS_FILE: questions_df, MAP_FILE: map_df, SCHEMAS_FILE: schemas_df}
+    for filename, columns in REQUIRED_COLUMNS.items():
+        missing = [c for c in columns if c not in frames[filename].columns]
+        if missing:
+            raise ValueError(f"{filename} is missing columns: {', '.join(missing)}")
+    unknown_questions = set(map_df['Question_ID']) - set(questions_df['ID'])
+    if unknown_questions:
+        raise ValueError(f"{MAP_FILE} references unknown questions: {sorted(unknown_questions)}")
+    unknown_schemas = set(map_df['Schema_ID']) - set(schemas_df['Schema'])
+    if unknown_schemas:
+        raise ValueError(f"{MAP_FILE} references schemas missing from {SCHEMAS_FILE}: {sorted(unknown_schemas)}")
+
+
+def build_bundle(contents, file_hashes, version):
+    questions_df = parse_csv(contents[QUESTIONS_FILE], QUESTIONS_FILE)
+    map_df = parse_csv(contents[MAP_FILE], MAP_FILE)
+    schemas_df = parse_csv(contents[SCHEMAS_FILE], SCHEMAS_FILE)
+    validate_frames(questions_df, map_df, schemas_df)
+    score_matrix = ScoreMatrix(map_df, questions_df['ID'])
+    return AssessmentBundle(questions_df, map_df, schemas_df, score_matrix, file_hashes, version)
+
+
+def read_snapshot(path, version):
+    try:
+        with open(path, 'rb') as f:
+            bundle = pickle.load(f)
+    except Exception:
+        # The snapshot is only a cache; one written by other pandas/numpy
+        # versions can fail in many ways, and the CSVs are always there
+        return None
+    if isinstance(bundle, AssessmentBundle) and bundle.version == version:
+        return bundle
+    return None
+
+
+def write_snapshot(path, bundle):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The snapshot is only a cold-start optimisation
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+_bundles = {}
+_lock = threading.Lock()
+
+
+def _file_stats(paths):
+    stats = [os.stat(p) for p in paths]
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def load_bundle(data_dir=None, snapshot_path=None):
+    data_dir = os.path.abspath(data_dir or DATA_DIR)
+    snapshot_path = snapshot_path or SNAPSHOT_PATH
+    paths = [os.path.join(data_dir, name) for name in REQUIRED_COLUMNS]
+    try:
+        stats = _file_stats(paths)
+    except OSError as e:
+        raise ValueError(f"Could not load {e.filename}") from e
+
+    with _lock:
+        cached = _bundles.get(data_dir)
+        # Unchanged stat info means unchanged files, so nothing is read at all
+        if cached and cached[0] == stats:
+            return cached[1]
+
+        contents = {}
+        for name, path in zip(REQUIRED_COLUMNS, paths):
+            with open(path, 'rb') as f:
+                contents[name] = f.read()
+        file_hashes = {name: hashlib.sha256(data).hexdigest() for name, data in contents.items()}
+        version = hashlib.sha256(''.join(file_hashes.values()).encode()).hexdigest()[:16]
+
+        if cached and cached[1].version == version:
+            bundle = cached[1]
+        else:
+            bundle = read_snapshot(snapshot_path, version) if snapshot_path else None
+            if bundle is None:
+                bundle = build_bundle(contents, file_hashes, version)
+                if snapshot_path:
+                    write_snapshot(snapshot_path, bundle)
+        _bundles[data_dir] = (stats, bundle)
+        return bundle
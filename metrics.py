@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Everything here is a no-op unless APP_METRICS=1, so instrumented code costs a
+# flag check (and a shared null context manager) when metrics are off.
+ENABLED = os.environ.get("APP_METRICS") == "1"
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", "15"))
+
+SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (5, 10, 15, 20, 30, 50, 100, 200, 500)
+
+_NULL_SPAN = nullcontext()
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {
+    'app_phase_seconds': "Time spent in each phase of a Streamlit rerun.",
+    'app_reruns_total': "Script reruns across all sessions.",
+    'app_sessions_started_total': "Sessions that started an assessment.",
+    'app_sessions_completed_total': "Sessions that reached the results page.",
+    'app_reruns_per_completed_session': "Reruns a session needed to reach the results page.",
+}
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+def inc(name, value=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value, buckets=SPAN_BUCKETS, **labels):
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+
+class _Span:
+    __slots__ = ('phase', 'start')
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.start = time.perf_counter()
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        observe('app_phase_seconds', time.perf_counter() - self.start, phase=self.phase)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def stop(self):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def span(phase):
+    """Context manager timing one phase into app_phase_seconds{phase=...}."""
+    return _Span(phase) if ENABLED else _NULL_SPAN
+
+
+def start_timer(phase):
+    """Like span() for code that can't be indented; call .stop() at the end."""
+    return _Span(phase) if ENABLED else _NULL_TIMER
+
+
+# ============================ EXPORT ============================
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (h.buckets, list(h.counts), h.total, h.count) for key, h in _histograms.items()}
+
+    lines = []
+    for name in sorted(counters):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {counters[name]}")
+
+    seen = set()
+    for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return '\n'.join(lines) + '\n'
+
+
+def summary():
+    """{(name, labels): (count, mean seconds)} for the debug panel."""
+    with _lock:
+        return {key: (h.count, h.total / h.count if h.count else 0.0) for key, h in _histograms.items()}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def write_file(path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """Start the METRICS_FILE writer and METRICS_PORT endpoint, once per process."""
+    global _exporters_started
+    with _lock:
+        if not ENABLED or _exporters_started:
+            return
+        _exporters_started = True
+
+    if METRICS_FILE:
+        def export_loop():
+            while True:
+                time.sleep(EXPORT_INTERVAL)
+                try:
+                    write_file(METRICS_FILE)
+                except OSError:
+                    pass
+        threading.Thread(target=export_loop, name="metrics-file-export", daemon=True).start()
+
+    if METRICS_PORT:
+        server = ThreadingHTTPServer(('0.0.0.0', int(METRICS_PORT)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
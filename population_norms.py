@@ -0,0 +1,237 @@
+"""Per-schema population norms for "higher than X% of respondents".
+
+Rebuild a snapshot offline from stored responses or a batch_score export:
+
+    python population_norms.py --store responses.db -o population_norms.npz
+    python population_norms.py --export scores.csv -o population_norms.npz
+"""
+import argparse
+import csv
+import fcntl
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+import numpy as np
+
+from data_loader import load_bundle
+from response_store import iter_responses
+
+SCORE_RESOLUTION = 10  # scores are rounded to 0.1
+
+
+# ============================ POPULATION NORMS ============================
+# Each schema keeps a histogram of scores on the 0.1 grid, stored as a Fenwick
+# tree, so adding a respondent and looking up a percentile are both
+# O(log bins) and independent of how many respondents have been seen.
+#
+# With a response store, the store is the source of truth: norms record the
+# id of the last stored response they include (last_id), and every process
+# replays newer responses from the store instead of counting its own. All
+# processes therefore converge on the same counts, and a snapshot is only
+# ever replaced by one that includes more of the store.
+class PopulationNorms:
+    def __init__(self, schema_ids, map_version, max_score=100.0, counts=None, last_id=0):
+        self.schema_ids = [int(sid) for sid in schema_ids]
+        self.map_version = map_version
+        self.last_id = last_id
+        self.n_bins = int(round(max_score * SCORE_RESOLUTION)) + 1
+        self._schema_index = {sid: i for i, sid in enumerate(self.schema_ids)}
+        self._counts = [[0] * self.n_bins for _ in self.schema_ids]
+        self._trees = [[0] * (self.n_bins + 1) for _ in self.schema_ids]
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.count = 0
+        if counts is not None:
+            self._load_counts(np.asarray(counts, dtype=np.int64))
+
+    def _bin(self, score):
+        return min(max(int(round(score * SCORE_RESOLUTION)), 0), self.n_bins - 1)
+
+    def _load_counts(self, counts):
+        for s, row in enumerate(counts):
+            tree = self._trees[s]
+            self._counts[s] = [int(c) for c in row]
+            tree[1:] = self._counts[s]
+            for i in range(1, self.n_bins + 1):
+                parent = i + (i & -i)
+                if parent <= self.n_bins:
+                    tree[parent] += tree[i]
+        self.count = int(counts[0].sum()) if len(counts) else 0
+
+    def add(self, scores):
+        with self._lock:
+            for sid, score in scores.items():
+                s = self._schema_index.get(int(sid))
+                if s is None:
+                    continue
+                b = self._bin(score)
+                self._counts[s][b] += 1
+                tree, i = self._trees[s], b + 1
+                while i <= self.n_bins:
+                    tree[i] += 1
+                    i += i & -i
+            self.count += 1
+            self._dirty = True
+
+    def _below(self, s, b):
+        tree, i, total = self._trees[s], b, 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def percentile(self, schema_id, score):
+        """Percentage of respondents scoring strictly lower, or None if unknown."""
+        s = self._schema_index.get(int(schema_id))
+        if s is None or not self.count:
+            return None
+        with self._lock:
+            below = self._below(s, self._bin(score))
+        return round(below / self.count * 100, 1)
+
+    def counts(self):
+        with self._lock:
+            return np.array(self._counts, dtype=np.int64)
+
+    # ---------------------------- store ----------------------------
+    def update_from_store(self, path):
+        """Add stored responses newer than last_id; returns how many were added."""
+        added, last_id = 0, self.last_id
+        for response in iter_responses(path, after_id=last_id):
+            if response['map_version'] == self.map_version:
+                self.add(response['scores'])
+                added += 1
+            last_id = response['id']
+        self.last_id = last_id
+        return added
+
+    def follow_store(self, path, snapshot_path=None, interval=15):
+        """Keep up with the store in a background thread, snapshotting changes."""
+        def refresh():
+            if os.path.isfile(path):
+                try:
+                    self.update_from_store(path)
+                except sqlite3.Error:
+                    pass
+            if snapshot_path and self._dirty:
+                try:
+                    self.save(snapshot_path)
+                except OSError:
+                    pass
+
+        def run():
+            while not stop.wait(interval):
+                refresh()
+        refresh()
+        stop = threading.Event()
+        threading.Thread(target=run, name="population-norms-follow", daemon=True).start()
+        return stop
+
+    # ---------------------------- snapshots ----------------------------
+    def save(self, path, force=False):
+        """Write a snapshot unless the one on disk already includes as much of the store.
+
+        Writers hold an exclusive lock on path + '.lock', so a process never
+        replaces a snapshot that is further along than its own counts.
+        """
+        counts, last_id = self.counts(), self.last_id
+        with open(f"{path}.lock", 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            current = None if force else snapshot_position(path)
+            if current and current[0] == self.map_version and current[1] >= last_id:
+                self._dirty = False
+                return False
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, counts=counts, schema_ids=np.array(self.schema_ids),
+                                    map_version=np.array(self.map_version), last_id=np.array(last_id))
+            os.replace(tmp_path, path)
+        self._dirty = False
+        return True
+
+    @classmethod
+    def load(cls, path, map_version=None):
+        """Load a snapshot; None if missing, from before last_id was recorded, or for another map version."""
+        try:
+            with np.load(path) as data:
+                version = str(data['map_version'])
+                if map_version is not None and version != map_version:
+                    return None
+                counts = data['counts']
+                schema_ids = data['schema_ids'].tolist()
+                last_id = int(data['last_id'])
+        except (OSError, KeyError, ValueError):
+            return None
+        max_score = (counts.shape[1] - 1) / SCORE_RESOLUTION
+        return cls(schema_ids, version, max_score, counts, last_id)
+
+    # ---------------------------- rebuilds ----------------------------
+    @classmethod
+    def from_scores(cls, schema_ids, map_version, score_dicts, max_score=100.0):
+        norms = cls(schema_ids, map_version, max_score)
+        for scores in score_dicts:
+            if scores:
+                norms.add(scores)
+        return norms
+
+    @classmethod
+    def from_store(cls, path, schema_ids, map_version, max_score=100.0):
+        norms = cls(schema_ids, map_version, max_score)
+        norms.update_from_store(path)
+        return norms
+
+    @classmethod
+    def from_export(cls, path, schema_ids, map_version, max_score=100.0):
+        return cls.from_scores(schema_ids, map_version, read_export_scores(path), max_score)
+
+
+def snapshot_position(path):
+    """(map_version, last_id) of the snapshot at path, or None."""
+    try:
+        with np.load(path) as data:
+            return str(data['map_version']), int(data['last_id'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def read_export_scores(path):
+    """Yield score dicts from a batch_score.py CSV or JSONL output file."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if str(path).lower().endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if line.strip():
+                    yield {int(sid): pct for sid, pct in json.loads(line)['scores'].items()}
+        else:
+            for row in csv.DictReader(f):
+                yield {int(col[len('schema_'):]): float(value) for col, value in row.items()
+                       if col.startswith('schema_') and value}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the population norms snapshot.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--store', help="SQLite response store to read")
+    source.add_argument('--export', help="batch_score.py CSV/JSONL output to read")
+    parser.add_argument('-o', '--output', default='population_norms.npz')
+    parser.add_argument('--data-dir', help="directory holding the assessment CSVs")
+    args = parser.parse_args(argv)
+
+    source = args.store or args.export
+    if not os.path.isfile(source):
+        sys.exit(f"error: {source} does not exist")
+
+    bundle = load_bundle(args.data_dir)
+    schema_ids = bundle.score_matrix.schema_ids
+    if args.store:
+        norms = PopulationNorms.from_store(args.store, schema_ids, bundle.map_version)
+    else:
+        norms = PopulationNorms.from_export(args.export, schema_ids, bundle.map_version)
+    norms.save(args.output, force=True)
+    print(f"Wrote norms for {norms.count} respondents to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
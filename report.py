@@ -0,0 +1,108 @@
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from io import BytesIO
+from multiprocessing import Pool
+
+from fpdf import FPDF
+
+REPORT_HEADER = "--- Latent Recursion Test Report ---\n\n"
+
+
+def pdf_safe(text):
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def generate_pdf(plain_text):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.multi_cell(0, 10, pdf_safe(plain_text))
+    pdf_bytes = BytesIO(pdf.output(dest='S').encode('latin-1'))
+    pdf_bytes.seek(0)
+    return pdf_bytes
+
+
+def format_action_plan_html(plan_text):
+    formatted = re.sub(r'(Week \d+:)', r'<br><br><span style="font-weight:900;color:#c084fc;font-size:1.4rem">\1</span>', plan_text)
+    # Final reduction on action plan text size
+    return f"<div style='line-height:1.6; font-size:1.05rem; color:#e2e8f0'>{formatted}</div>"
+
+
+# ============================ REPORT ENGINE ============================
+# Everything in a report except the score on each schema heading is static,
+# so each schema's section is built (and made PDF-safe) once up front and
+# finished reports are kept in an LRU cache keyed by (top_schemas, scores).
+class ReportEngine:
+    def __init__(self, schemas_df, action_plans, cache_size=256):
+        self.sections = {}
+        for r in schemas_df.to_dict('records'):
+            sid = int(r['Schema'])
+            if sid not in action_plans:
+                continue
+            self.sections[sid] = (
+                pdf_safe(f"Schema: {r['Schema Name']} ("),
+                pdf_safe(f"%)\nRoot: {r['Root Causes (Childhood Drivers)']}\nPatterns: {r['Symptoms & Behavioral Loops']}\nPlan:\n{action_plans[sid]}\n\n"),
+            )
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def plain_text(self, top_schemas, top_scores):
+        parts = [REPORT_HEADER]
+        for sid in top_schemas:
+            head, body = self.sections[sid]
+            parts.append(f"{head}{top_scores[sid]}{body}")
+        return ''.join(parts)
+
+    def render(self, top_schemas, top_scores):
+        key = tuple((sid, top_scores[sid]) for sid in top_schemas)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        pdf = generate_pdf(self.plain_text(top_schemas, top_scores)).getvalue()
+        with self._lock:
+            self._cache[key] = pdf
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return pdf
+
+    def render_zip(self, reports, target, workers=None):
+        """Render (filename, top_schemas, top_scores) items into a ZIP archive.
+
+        Reports are rendered across a process pool and written to ``target``
+        (a path or binary file object) as they finish, with only a few held in
+        memory at a time. Returns the number of reports written.
+        """
+        count = 0
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for filename, pdf in self._iter_rendered(reports, workers):
+                archive.writestr(filename, pdf)
+                count += 1
+        return count
+
+    def _iter_rendered(self, reports, workers):
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for filename, top_schemas, top_scores in reports:
+                yield filename, _render_text(self.plain_text(top_schemas, top_scores))
+            return
+        pending = deque()
+        with Pool(workers) as pool:
+            for filename, top_schemas, top_scores in reports:
+                text = self.plain_text(top_schemas, top_scores)
+                pending.append((filename, pool.apply_async(_render_text, (text,))))
+                if len(pending) >= 2 * workers:
+                    filename, result = pending.popleft()
+                    yield filename, result.get()
+            while pending:
+                filename, result = pending.popleft()
+                yield filename, result.get()
+
+
+def _render_text(text):
+    return generate_pdf(text).getvalue()
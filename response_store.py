@@ -0,0 +1,132 @@
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+from answer_codec import layout_fingerprint
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    completed_at REAL NOT NULL,
+    map_version TEXT NOT NULL,
+    answers_layout TEXT NOT NULL,
+    answers BLOB NOT NULL,
+    scores TEXT NOT NULL
+)
+"""
+INSERT = ("INSERT INTO responses (completed_at, map_version, answers_layout, answers, scores) "
+          "VALUES (?, ?, ?, ?, ?)")
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ============================ RESPONSE STORE ============================
+# Append-only SQLite store for completed assessments. submit() only enqueues;
+# a single background thread owns the write connection and inserts queued
+# responses in batches, so script threads never wait on disk I/O.
+class ResponseStore:
+    def __init__(self, path, batch_size=500, flush_interval=0.25, max_pending=50000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(max_pending)
+        self._closed = threading.Event()
+
+        conn = connect(path)
+        with conn:
+            conn.execute(SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="response-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def submit(self, answers, scores, map_version, completed_at=None):
+        """Queue a completed assessment; returns False if it had to be dropped.
+
+        ``answers`` is a PackedAnswers; ``scores`` maps schema id to percentage.
+        """
+        row = (completed_at or time.time(), map_version, layout_fingerprint(answers.question_ids).hex(),
+               answers.to_bytes(), json.dumps({str(sid): pct for sid, pct in scores.items()}))
+        if self._closed.is_set():
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            self._writer.join()
+
+    def _run(self):
+        conn = connect(self.path)
+        try:
+            while not (self._closed.is_set() and self._queue.empty()):
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    with conn:
+                        conn.executemany(INSERT, batch)
+                    self.written += len(batch)
+                except sqlite3.Error:
+                    self.dropped += len(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def iter_responses(self, after_id=0, page_size=1000):
+        return iter_responses(self.path, after_id, page_size)
+
+
+def iter_responses(path, after_id=0, page_size=1000):
+    """Stream stored responses in insertion order, one page per query.
+
+    Opens the database read-only, so a missing file raises sqlite3.OperationalError
+    instead of creating an empty store.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        while True:
+            rows = conn.execute(
+                "SELECT id, completed_at, map_version, answers_layout, answers, scores FROM responses "
+                "WHERE id > ? ORDER BY id LIMIT ?", (after_id, page_size)).fetchall()
+            if not rows:
+                return
+            for row_id, completed_at, map_version, layout, answers, scores in rows:
+                yield {
+                    'id': row_id,
+                    'completed_at': completed_at,
+                    'map_version': map_version,
+                    'answers_layout': layout,
+                    'answers': answers,
+                    'scores': {int(sid): pct for sid, pct in json.loads(scores).items()},
+                }
+            after_id = rows[-1][0]
+    finally:
+        conn.close()
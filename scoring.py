@@ -0,0 +1,212 @@
+import numpy as np
+
+ACE_QUESTION_IDS = range(61, 71)
+TRAUMA_SCHEMA_ID = 20
+TRAUMA_ROOT_NOTE = "Trauma Core Schema (No. 20) is highly elevated and may be a root driver of other schemas."
+
+
+def is_ace_question(qid):
+    return qid in ACE_QUESTION_IDS
+
+
+# ============================ COMPILED SCORE MAP ============================
+# The weighted map is compiled once into dense arrays so that a respondent's raw
+# schema score is a single dot product:
+#
+#     raw[schema] = x @ weights[:, schema] + offsets[schema]
+#
+# where x is the answer vector (1-5) with ACE questions binarized to 0/1.
+# A direct item contributes +x, a reverse item contributes (q_max + 1 - x),
+# i.e. weight -1 and offset q_max + 1.
+class ScoreMatrix:
+    def __init__(self, map_df, question_ids):
+        self.question_ids = np.asarray(question_ids, dtype=np.int64)
+        self.schema_ids = [int(sid) for sid in map_df['Schema_ID'].unique()]
+        self.question_index = {int(qid): i for i, qid in enumerate(self.question_ids)}
+        self.ace_mask = np.array([is_ace_question(int(qid)) for qid in self.question_ids])
+        # Range of a transformed answer per question column
+        self.value_min = np.where(self.ace_mask, 0, 1)
+        self.value_max = np.where(self.ace_mask, 1, 5)
+
+        n_questions, n_schemas = len(self.question_ids), len(self.schema_ids)
+        schema_index = {sid: i for i, sid in enumerate(self.schema_ids)}
+        weights = np.zeros((n_questions, n_schemas), dtype=np.int64)
+        offsets = np.zeros(n_schemas, dtype=np.int64)
+        max_scores = np.zeros(n_schemas, dtype=np.int64)
+        # Highest raw sum a schema can reach; reverse-scored ACE items can score
+        # 2 against a q_max of 1, so this may exceed max_scores.
+        raw_ceiling = np.zeros(n_schemas, dtype=np.int64)
+        # Reverse index: question id -> [(schema column, weight, offset, q_max)]
+        question_schemas = {}
+
+        for sid, qid, direction in map_df[['Schema_ID', 'Question_ID', 'Direction']].itertuples(index=False):
+            s = schema_index[int(sid)]
+            q_min, q_max = (0, 1) if is_ace_question(int(qid)) else (1, 5)
+            weight, offset = (1, 0) if direction == 1 else (-1, q_max + 1)
+            max_scores[s] += q_max
+            raw_ceiling[s] += q_max if direction == 1 else q_max + 1 - q_min
+            col = self.question_index.get(int(qid))
+            if col is None:
+                # Unknown question: the answer is always clamped up to the minimum
+                offsets[s] += weight * q_min + offset
+            else:
+                weights[col, s] += weight
+                offsets[s] += offset
+                entries = question_schemas.setdefault(int(qid), {})
+                w, o, m = entries.get(s, (0, 0, 0))
+                entries[s] = (w + weight, o + offset, m + q_max)
+
+        self.weights = weights
+        self.offsets = offsets
+        self.max_scores = max_scores
+        self.raw_ceiling = raw_ceiling
+        self.question_schemas = {
+            qid: tuple((s, w, o, m) for s, (w, o, m) in entries.items())
+            for qid, entries in question_schemas.items()
+        }
+
+        # Percentages are looked up rather than computed so that batch output is
+        # bit-for-bit identical to round((raw / max) * 100, 1).
+        self._percent_table = np.zeros((n_schemas, int(raw_ceiling.max(initial=0)) + 1))
+        for s in range(n_schemas):
+            max_possible, ceiling = int(max_scores[s]), int(raw_ceiling[s])
+            if max_possible > 0:
+                self._percent_table[s, :ceiling + 1] = [
+                    round((raw / max_possible) * 100, 1) for raw in range(ceiling + 1)
+                ]
+
+        for arr in (self.question_ids, self.ace_mask, self.value_min, self.value_max, self.weights,
+                    self.offsets, self.max_scores, self.raw_ceiling, self._percent_table):
+            arr.setflags(write=False)
+
+    def transform_answer(self, qid, value):
+        value = min(max(int(value), 1), 5)
+        return int(value > 1) if is_ace_question(int(qid)) else value
+
+    def percentage(self, schema_col, raw):
+        return float(self._percent_table[schema_col, raw])
+
+    def percentages(self, raw):
+        """Rounded percentages for integer raw scores (... x len(schema_ids))."""
+        return self._percent_table[np.arange(len(self.schema_ids)), raw]
+
+    def answers_to_row(self, answers):
+        row = np.zeros(len(self.question_ids), dtype=np.int64)
+        for qid, val in answers.items():
+            col = self.question_index.get(int(qid))
+            if col is not None:
+                row[col] = val
+        return row
+
+    def transform(self, answers_matrix):
+        x = np.clip(np.asarray(answers_matrix, dtype=np.int64), 1, 5)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        return np.where(self.ace_mask, (x > 1).astype(np.int64), x)
+
+    def raw_scores(self, answers_matrix):
+        return self.transform(answers_matrix) @ self.weights + self.offsets
+
+    def score_batch(self, answers_matrix):
+        """Score N respondents x len(question_ids) answers (in question order).
+
+        Returns an N x len(schema_ids) float array of rounded percentages, with
+        columns in ``schema_ids`` order. Out-of-range answers are clamped to 1-5.
+        """
+        return self.percentages(self.raw_scores(answers_matrix))
+
+    def scores_to_dict(self, row):
+        return {sid: float(pct) for sid, pct in zip(self.schema_ids, row)}
+
+    def score(self, answers):
+        if len(answers) != len(self.question_ids):
+            return {}
+        return self.scores_to_dict(self.score_batch(self.answers_to_row(answers))[0])
+
+    def expected_scores(self, values):
+        """Percentages for transformed values that may be fractional.
+
+        Used when some questions were never asked and their values are
+        estimates; with whole values this equals score() exactly.
+        """
+        raw = np.asarray(values, dtype=float) @ self.weights + self.offsets
+        return {sid: round((float(raw[s]) / int(self.max_scores[s])) * 100, 1) if self.max_scores[s] else 0.0
+                for s, sid in enumerate(self.schema_ids)}
+
+
+# ============================ INCREMENTAL SCORING ============================
+# Running per-schema sums for one respondent. Each answer change touches only
+# the schemas that question maps to (via ScoreMatrix.question_schemas), so the
+# final scores are a constant-time read and partial answers can be previewed.
+class IncrementalScores:
+    __slots__ = ('matrix', '_values', '_answered', '_dot', '_answered_offset', '_answered_max')
+    UNANSWERED = 0xFF
+
+    def __init__(self, matrix):
+        n_schemas = len(matrix.schema_ids)
+        self.matrix = matrix
+        # Transformed answer per question column, UNANSWERED if not given
+        self._values = bytearray([self.UNANSWERED]) * len(matrix.question_ids)
+        self._answered = 0
+        self._dot = [0] * n_schemas
+        self._answered_offset = [0] * n_schemas
+        self._answered_max = [0] * n_schemas
+
+    @classmethod
+    def from_answers(cls, matrix, answers):
+        scores = cls(matrix)
+        for qid, value in answers.items():
+            scores.update(qid, value)
+        return scores
+
+    def update(self, qid, value):
+        """Record (or with value=None, clear) the answer to one question."""
+        col = self.matrix.question_index.get(int(qid))
+        if col is None:
+            return
+        old = self._values[col]
+        new = self.UNANSWERED if value is None else self.matrix.transform_answer(qid, value)
+        if new == old:
+            return
+        self._values[col] = new
+        if old == self.UNANSWERED:
+            self._answered += 1
+        elif new == self.UNANSWERED:
+            self._answered -= 1
+        old_x = 0 if old == self.UNANSWERED else old
+        new_x = 0 if new == self.UNANSWERED else new
+        for s, weight, offset, q_max in self.matrix.question_schemas.get(int(qid), ()):
+            self._dot[s] += weight * (new_x - old_x)
+            if old == self.UNANSWERED:
+                self._answered_offset[s] += offset
+                self._answered_max[s] += q_max
+            elif new == self.UNANSWERED:
+                self._answered_offset[s] -= offset
+                self._answered_max[s] -= q_max
+
+    def __len__(self):
+        return self._answered
+
+    def scores(self):
+        # Same result as ScoreMatrix.score: nothing until every question is answered
+        if self._answered != len(self.matrix.question_ids):
+            return {}
+        return {sid: self.matrix.percentage(s, int(self.matrix.offsets[s]) + self._dot[s])
+                for s, sid in enumerate(self.matrix.schema_ids)}
+
+    def provisional_scores(self):
+        # Percentages over the answered items only, for schemas with any answered
+        return {sid: round(((self._dot[s] + self._answered_offset[s]) / self._answered_max[s]) * 100, 1)
+                for s, sid in enumerate(self.matrix.schema_ids) if self._answered_max[s]}
+
+
+def get_top_schemas(scores, trauma_threshold=60):
+    sorted_scores = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+    top_3 = [item[0] for item in sorted_scores[:3]]
+    trauma_score = scores.get(TRAUMA_SCHEMA_ID, 0)
+    display = top_3.copy()
+    root_cause_note = None
+    if trauma_score > trauma_threshold and TRAUMA_SCHEMA_ID not in top_3:
+        display.append(TRAUMA_SCHEMA_ID)
+        root_cause_note = TRAUMA_ROOT_NOTE
+    return display, root_cause_note, {sid: scores[sid] for sid in display}
@@ -0,0 +1,289 @@
+"""Stateless HTTP scoring service, independent of the Streamlit UI.
+
+    uvicorn scoring_service:app --workers 4
+
+POST /score          {"answers": {"1": 3, ..., "100": 5}}  (or a list of 100 values in question order)
+POST /score/batch    {"responses": [answers, answers, ...]}
+POST /report         {"answers": ...}  -> streams the PDF report
+GET  /healthz
+GET  /metrics        Prometheus text (with APP_METRICS=1)
+
+Concurrent /score and /score/batch requests are coalesced by a micro-batcher
+into a single vectorized ScoreMatrix.score_batch call.
+"""
+import asyncio
+import json
+import os
+
+import numpy as np
+
+import metrics
+from action_plans import ACTION_PLANS
+from data_loader import load_bundle
+from report import ReportEngine
+from scoring import get_top_schemas
+
+MAX_BODY_BYTES = int(os.environ.get("SCORING_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+MAX_BATCH_ROWS = int(os.environ.get("SCORING_MAX_BATCH_ROWS", "4096"))
+BATCH_WINDOW = float(os.environ.get("SCORING_BATCH_WINDOW_MS", "2")) / 1000
+PDF_CHUNK_BYTES = 64 * 1024
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================ MICRO-BATCHING ============================
+# Requests arriving within BATCH_WINDOW of each other (or until MAX_BATCH_ROWS
+# rows are queued) are stacked into one answers matrix and scored together in
+# a worker thread, keeping the event loop free.
+class MicroBatcher:
+    def __init__(self, matrix, max_rows=MAX_BATCH_ROWS, window=BATCH_WINDOW):
+        self.matrix = matrix
+        self.max_rows = max_rows
+        self.window = window
+        self._pending = []
+        self._pending_rows = 0
+        self._timer = None
+
+    async def score(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending):
+        stacked = np.vstack([rows for rows, _ in pending])
+        try:
+            with metrics.span("service_score_batch"):
+                scored = await asyncio.get_running_loop().run_in_executor(None, self.matrix.score_batch, stacked)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for rows, future in pending:
+            if not future.done():
+                future.set_result(scored[start:start + len(rows)])
+            start += len(rows)
+
+
+# ============================ SERVICE ============================
+# Each request reads the bundle once and passes it through parsing, scoring
+# and formatting, so a request never mixes two map versions. Loading the
+# bundle, parsing and formatting all run in a worker thread.
+def parse_rows(matrix, responses):
+    """Answer sets (dicts keyed by question id, or lists in question order) -> N x Q int array."""
+    qids = [int(qid) for qid in matrix.question_ids]
+    keys = [str(qid) for qid in qids]
+    rows = []
+    for i, answers in enumerate(responses):
+        if isinstance(answers, list):
+            row = answers
+        elif isinstance(answers, dict):
+            try:
+                row = [answers[key] for key in keys]
+            except KeyError:
+                missing = [qid for qid, key in zip(qids, keys) if key not in answers]
+                raise RequestError(422, f"responses[{i}]: missing answers for questions {missing}") from None
+        else:
+            raise RequestError(422, f"responses[{i}]: answers must be an object or a list")
+        # JSON true/false would otherwise pass as the integers 1 and 0
+        if any(isinstance(v, bool) for v in row):
+            raise RequestError(422, f"responses[{i}]: every answer must be an integer from 1 to 5")
+        rows.append(row)
+
+    try:
+        values = np.asarray(rows)
+    except ValueError:
+        values = None
+    if values is None or values.ndim != 2 or values.shape[1] != len(qids):
+        for i, row in enumerate(rows):
+            if len(row) != len(qids):
+                raise RequestError(422, f"responses[{i}]: expected {len(qids)} answers, got {len(row)}")
+        raise RequestError(422, "every answer must be an integer from 1 to 5")
+    if values.dtype.kind != 'i' or values.min() < 1 or values.max() > 5:
+        if values.dtype.kind == 'i':
+            bad = int(np.nonzero((values < 1).any(axis=1) | (values > 5).any(axis=1))[0][0])
+            raise RequestError(422, f"responses[{bad}]: every answer must be an integer from 1 to 5")
+        raise RequestError(422, "every answer must be an integer from 1 to 5")
+    return values.astype(np.int64, copy=False)
+
+
+def format_results(bundle, scored):
+    schema_ids = bundle.score_matrix.schema_ids
+    keys = [str(sid) for sid in schema_ids]
+    results = []
+    for row in scored.tolist():
+        scores = dict(zip(schema_ids, row))
+        top_schemas, root_note, top_scores = get_top_schemas(scores)
+        results.append({
+            'scores': dict(zip(keys, row)),
+            'top_schemas': top_schemas,
+            'top_scores': {str(sid): pct for sid, pct in top_scores.items()},
+            'root_cause_note': root_note,
+            'map_version': bundle.map_version,
+        })
+    return results
+
+
+class ScoringService:
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir
+        self._batchers = {}
+
+    async def _bundle(self):
+        # A changed CSV is re-read, parsed and compiled under load_bundle's
+        # lock, so keep that off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, load_bundle, self.data_dir)
+
+    def _batcher(self, bundle):
+        batcher = self._batchers.get(bundle.version)
+        if batcher is None:
+            self._batchers = {bundle.version: MicroBatcher(bundle.score_matrix)}
+            batcher = self._batchers[bundle.version]
+        return batcher
+
+    async def _score(self, bundle, responses):
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, parse_rows, bundle.score_matrix, responses)
+        scored = await self._batcher(bundle).score(rows)
+        return await loop.run_in_executor(None, format_results, bundle, scored)
+
+    async def score(self, bundle, body):
+        try:
+            results = await self._score(bundle, [body.get('answers')])
+        except RequestError as e:
+            raise RequestError(e.status, str(e).replace("responses[0]: ", "")) from None
+        return results[0]
+
+    async def score_batch(self, bundle, body):
+        responses = body.get('responses')
+        if not isinstance(responses, list) or not responses:
+            raise RequestError(422, "responses must be a non-empty list")
+        return {'results': await self._score(bundle, responses)}
+
+    async def report(self, bundle, body):
+        result = await self.score(bundle, body)
+        top_schemas = result['top_schemas']
+        top_scores = {int(sid): pct for sid, pct in result['top_scores'].items()}
+        engine = report_engine(bundle)
+        with metrics.span("service_pdf"):
+            return await asyncio.get_running_loop().run_in_executor(None, engine.render, top_schemas, top_scores)
+
+    # ---------------------------- ASGI ----------------------------
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send, self.data_dir)
+            return
+        if scope['type'] != 'http':
+            return
+        method, path = scope['method'], scope['path'].rstrip('/') or '/'
+        metrics.inc("service_requests_total")
+        try:
+            if path == '/healthz' and method == 'GET':
+                await send_json(send, 200, {'status': 'ok', 'version': (await self._bundle()).version})
+            elif path == '/metrics' and method == 'GET':
+                await send_body(send, 200, metrics.render_prometheus().encode(), b'text/plain; version=0.0.4')
+            elif path in ('/score', '/score/batch', '/report'):
+                if method != 'POST':
+                    raise RequestError(405, "method not allowed")
+                body = await read_json(receive)
+                bundle = await self._bundle()
+                if path == '/score':
+                    await send_json(send, 200, await self.score(bundle, body))
+                elif path == '/score/batch':
+                    await send_json(send, 200, await self.score_batch(bundle, body))
+                else:
+                    await stream_pdf(send, await self.report(bundle, body))
+            else:
+                raise RequestError(404, "not found")
+        except RequestError as e:
+            await send_json(send, e.status, {'error': str(e)})
+        except ValueError as e:
+            # Data files failed to load or validate
+            await send_json(send, 503, {'error': str(e)})
+
+
+_report_engines = {}
+
+
+def report_engine(bundle):
+    engine = _report_engines.get(bundle.version)
+    if engine is None:
+        _report_engines.clear()
+        engine = _report_engines[bundle.version] = ReportEngine(bundle.schemas_df, ACTION_PLANS)
+    return engine
+
+
+async def lifespan(receive, send, data_dir=None):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                load_bundle(data_dir)
+            except ValueError as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            metrics.start_exporters()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def read_json(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise RequestError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            break
+    try:
+        body = json.loads(b''.join(chunks) or b'{}')
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise RequestError(400, "body must be JSON") from None
+    if not isinstance(body, dict):
+        raise RequestError(400, "body must be a JSON object")
+    return body
+
+
+async def send_body(send, status, body, content_type):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, payload):
+    await send_body(send, status, json.dumps(payload).encode(), b'application/json')
+
+
+async def stream_pdf(send, pdf):
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'application/pdf'),
+                            (b'content-disposition', b'attachment; filename="latent_recursion_report.pdf"')]})
+    for start in range(0, len(pdf), PDF_CHUNK_BYTES):
+        await send({'type': 'http.response.body', 'body': pdf[start:start + PDF_CHUNK_BYTES], 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+app = ScoringService()
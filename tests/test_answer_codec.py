@@ -0,0 +1,111 @@
+"""Packed answers and resume tokens."""
+import base64
+
+import numpy as np
+import pytest
+
+from answer_codec import PackedAnswers, decode_resume_token, encode_resume_token, packed_size
+
+QUESTION_IDS = tuple(range(1, 101))
+SECRET = b'test-secret'
+
+
+def token_bytes(token):
+    return bytearray(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+
+
+def to_token(raw):
+    return base64.urlsafe_b64encode(bytes(raw)).rstrip(b'=').decode('ascii')
+
+
+@pytest.fixture
+def answers():
+    rng = np.random.default_rng(5)
+    packed = PackedAnswers(QUESTION_IDS)
+    for qid in rng.choice(QUESTION_IDS, 70, replace=False):
+        packed[int(qid)] = int(rng.integers(1, 6))
+    return packed
+
+
+def test_packed_answers_match_a_dict():
+    rng = np.random.default_rng(0)
+    packed, expected = PackedAnswers(QUESTION_IDS), {}
+    for _ in range(2000):
+        qid = int(rng.choice(QUESTION_IDS))
+        if rng.random() < 0.2:
+            packed.pop(qid, None)
+            expected.pop(qid, None)
+        else:
+            packed[qid] = expected[qid] = int(rng.integers(1, 6))
+        assert len(packed) == len(expected)
+    assert dict(packed) == expected
+    assert len(packed.to_bytes()) == packed_size(len(QUESTION_IDS)) == 38
+    assert dict(PackedAnswers.from_bytes(QUESTION_IDS, packed.to_bytes())) == expected
+
+
+@pytest.mark.parametrize('value', [0, 6, -1, 7])
+def test_packed_answers_reject_out_of_range(value):
+    packed = PackedAnswers(QUESTION_IDS)
+    with pytest.raises(ValueError):
+        packed[1] = value
+    assert len(packed) == 0
+
+
+def test_packed_answers_reject_unknown_questions():
+    packed = PackedAnswers(QUESTION_IDS)
+    with pytest.raises(KeyError):
+        packed[101] = 3
+    with pytest.raises(ValueError):
+        PackedAnswers(QUESTION_IDS, bytes(37))
+
+
+@pytest.mark.parametrize('page', [0, 4, 10, 255])
+def test_token_round_trip(answers, page):
+    resumed = decode_resume_token(encode_resume_token(answers, page, SECRET), QUESTION_IDS, SECRET)
+    assert resumed is not None
+    assert resumed[0] == page
+    assert dict(resumed[1]) == dict(answers)
+
+
+def test_token_does_not_reveal_answers(answers):
+    first = encode_resume_token(answers, 3, SECRET)
+    assert answers.to_bytes() not in token_bytes(first)
+    # A fresh nonce per token: the same answers never give the same token
+    assert encode_resume_token(answers, 3, SECRET) != first
+
+
+def test_tampered_token_is_rejected(answers):
+    raw = token_bytes(encode_resume_token(answers, 3, SECRET))
+    for i in range(len(raw)):
+        tampered = raw.copy()
+        tampered[i] ^= 0x01
+        assert decode_resume_token(to_token(tampered), QUESTION_IDS, SECRET) is None
+    assert decode_resume_token(to_token(raw[:-1]), QUESTION_IDS, SECRET) is None
+    assert decode_resume_token(to_token(raw + b'\0'), QUESTION_IDS, SECRET) is None
+
+
+@pytest.mark.parametrize('token', ['', '!!!', 'a', 'AAAA', None])
+def test_malformed_token_is_rejected(token):
+    assert decode_resume_token(token, QUESTION_IDS, SECRET) is None
+
+
+def test_token_from_another_secret_is_rejected(answers):
+    token = encode_resume_token(answers, 3, SECRET)
+    assert decode_resume_token(token, QUESTION_IDS, b'other-secret') is None
+
+
+def test_token_for_another_question_layout_is_rejected(answers):
+    token = encode_resume_token(answers, 3, SECRET)
+    # Same number of questions, so the packed size alone would not catch it
+    reordered = QUESTION_IDS[1:] + QUESTION_IDS[:1]
+    assert decode_resume_token(token, reordered, SECRET) is None
+    assert decode_resume_token(token, QUESTION_IDS[:-1], SECRET) is None
+
+
+def test_out_of_range_packed_values_are_rejected(answers):
+    # 3 bits can hold 6 and 7; a validly encrypted token carrying them is still refused
+    data = bytearray(answers.to_bytes())
+    data[0] |= 0b111
+    forged = PackedAnswers(QUESTION_IDS, bytes(data))
+    token = encode_resume_token(forged, 3, SECRET)
+    assert decode_resume_token(token, QUESTION_IDS, SECRET) is None
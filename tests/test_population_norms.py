@@ -0,0 +1,89 @@
+"""Population norms built from, and kept in step with, the response store."""
+import numpy as np
+import pytest
+
+from answer_codec import PackedAnswers
+from population_norms import PopulationNorms
+from response_store import ResponseStore
+
+SCHEMA_IDS = [1, 2, 3]
+QUESTION_IDS = range(1, 11)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResponseStore(str(tmp_path / 'responses.db'))
+    yield store
+    store.close()
+
+
+def submit(store, n, rng, map_version='v1'):
+    answers = PackedAnswers(QUESTION_IDS)
+    scores = []
+    for _ in range(n):
+        row = {sid: round(float(rng.uniform(0, 100)), 1) for sid in SCHEMA_IDS}
+        store.submit(answers, row, map_version)
+        scores.append(row)
+    store.flush()
+    return scores
+
+
+def test_replay_picks_up_responses_stored_after_the_snapshot(store, tmp_path):
+    rng = np.random.default_rng(0)
+    snapshot = str(tmp_path / 'norms.npz')
+    first = submit(store, 30, rng)
+    norms = PopulationNorms.from_store(store.path, SCHEMA_IDS, 'v1')
+    assert norms.save(snapshot)
+    # Stored after the last snapshot, e.g. just before a crash
+    later = submit(store, 20, rng)
+    submit(store, 5, rng, map_version='v0')
+
+    restored = PopulationNorms.load(snapshot, 'v1')
+    assert restored.count == 30
+    assert restored.update_from_store(store.path) == 20
+    expected = PopulationNorms.from_scores(SCHEMA_IDS, 'v1', first + later)
+    assert restored.count == 50
+    assert np.array_equal(restored.counts(), expected.counts())
+    assert restored.last_id == 55
+
+
+def test_processes_do_not_overwrite_each_others_snapshots(store, tmp_path):
+    rng = np.random.default_rng(1)
+    snapshot = str(tmp_path / 'norms.npz')
+    submit(store, 10, rng)
+    behind = PopulationNorms.from_store(store.path, SCHEMA_IDS, 'v1')
+    submit(store, 10, rng)
+    ahead = PopulationNorms.from_store(store.path, SCHEMA_IDS, 'v1')
+
+    assert ahead.save(snapshot)
+    # A process that has seen less of the store leaves the newer snapshot alone
+    behind.add({1: 50.0})
+    assert not behind.save(snapshot)
+    assert PopulationNorms.load(snapshot, 'v1').count == 20
+
+    # Once it catches up it holds the same counts as every other process
+    behind = PopulationNorms.load(snapshot, 'v1')
+    behind.update_from_store(store.path)
+    assert np.array_equal(behind.counts(), ahead.counts())
+
+
+def test_follow_store_counts_each_stored_response_once(store, tmp_path):
+    rng = np.random.default_rng(2)
+    snapshot = str(tmp_path / 'norms.npz')
+    submit(store, 12, rng)
+    a = PopulationNorms(SCHEMA_IDS, 'v1')
+    b = PopulationNorms(SCHEMA_IDS, 'v1')
+    stops = [a.follow_store(store.path, snapshot, interval=3600), b.follow_store(store.path, snapshot, interval=3600)]
+    try:
+        assert a.count == b.count == 12
+        assert PopulationNorms.load(snapshot, 'v1').count == 12
+    finally:
+        for stop in stops:
+            stop.set()
+
+
+def test_snapshot_without_last_id_is_ignored(tmp_path):
+    path = str(tmp_path / 'old.npz')
+    np.savez_compressed(path, counts=np.zeros((3, 1001), dtype=np.int64), schema_ids=np.array(SCHEMA_IDS),
+                        map_version=np.array('v1'))
+    assert PopulationNorms.load(path, 'v1') is None